@@ -9,7 +9,53 @@ import json
 import sys
 from pathlib import Path
 from typing import Optional
-from metadata import get_metadata, get_metadata_by_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SEP = "=" * 60
+
+TIMELINE_TYPES = ('media', 'timeline', 'tweets', 'with_replies')
+MEDIA_TYPES = ('all', 'image', 'video', 'gif')
+
+# Subcommand defaults, shared by the fast parser and _build_full_parser
+MODE_DEFAULTS = {
+    'timeline': {
+        'timeline_type': 'media',
+        'batch_size': 100,
+        'page': 0,
+        'media_type': 'all',
+        'retweets': False,
+    },
+    'daterange': {
+        'start_date': None,
+        'end_date': None,
+        'media_filter': 'filter:media',
+    },
+}
+
+# Fast parser option tables, keyed by subcommand (None = global options)
+_VALUE_OPTIONS = {
+    None: {'--token': ('token', str), '--output': ('output', str)},
+    'timeline': {
+        '--timeline-type': ('timeline_type', TIMELINE_TYPES),
+        '--batch-size': ('batch_size', int),
+        '--page': ('page', int),
+        '--media-type': ('media_type', MEDIA_TYPES),
+    },
+    'daterange': {
+        '--start-date': ('start_date', str),
+        '--end-date': ('end_date', str),
+        '--filter': ('media_filter', str),
+    },
+}
+_FLAG_OPTIONS = {
+    None: {'--json': ('json', True), '--jsonl': ('jsonl', True)},
+    'timeline': {'--retweets': ('retweets', True), '--no-retweets': ('retweets', False)},
+    'daterange': {},
+}
 
 
 def print_success(message: str):
@@ -24,58 +70,76 @@ def print_info(message: str):
     print(f"Info: {message}")
 
 
+def _emit_json(data: dict, fp):
+    if orjson:
+        # Flush pending text output so it stays ordered before the raw bytes
+        fp.flush()
+        fp.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+        fp.buffer.flush()
+    else:
+        json.dump(data, fp, ensure_ascii=False, indent=2)
+        fp.write("\n")
+
+
 def print_result_summary(data: dict):
     if "error" in data:
         print_error(data["error"])
         return False
 
-    print("\n" + "="*60)
-    print("EXTRACTION SUMMARY")
-    print("="*60)
+    print(f"\n{SEP}\nEXTRACTION SUMMARY\n{SEP}")
 
     # Account Info
-    if "account_info" in data and data["account_info"]:
-        account = data["account_info"]
-        print(f"\nAccount: @{account.get('nick', 'N/A')}")
-        print(f"Name: {account.get('name', 'N/A')}")
-        print(f"Followers: {account.get('followers_count', 0):,}")
-        print(f"Following: {account.get('friends_count', 0):,}")
-        print(f"Total Tweets: {account.get('statuses_count', 0):,}")
-        print(f"Join Date: {account.get('date', 'N/A')}")
+    account = data.get("account_info")
+    if account:
+        print("\n".join((
+            f"\nAccount: @{account.get('nick', 'N/A')}",
+            f"Name: {account.get('name', 'N/A')}",
+            f"Followers: {account.get('followers_count', 0):,}",
+            f"Following: {account.get('friends_count', 0):,}",
+            f"Total Tweets: {account.get('statuses_count', 0):,}",
+            f"Join Date: {account.get('date', 'N/A')}",
+        )))
 
     # Extraction Stats
-    print(f"\nMedia URLs Found: {data.get('total_urls', 0):,}")
+    lines = [f"\nMedia URLs Found: {data.get('total_urls', 0):,}"]
 
-    if "metadata" in data:
-        meta = data["metadata"]
-        print(f"New Entries: {meta.get('new_entries', 0):,}")
+    meta = data.get("metadata")
+    if meta is not None:
+        lines.append(f"New Entries: {meta.get('new_entries', 0):,}")
 
         if "method" in meta:
-            print(f"Method: {meta['method']}")
+            lines.append(f"Method: {meta['method']}")
 
         if "date_range" in meta:
-            print(f"Date Range: {meta['date_range']}")
+            lines.append(f"Date Range: {meta['date_range']}")
 
         if "page" in meta:
-            print(f"Page: {meta['page']}")
-            print(f"Batch Size: {meta.get('batch_size', 'N/A')}")
-            print(f"Has More: {meta.get('has_more', False)}")
+            lines.append(f"Page: {meta['page']}")
+            lines.append(f"Batch Size: {meta.get('batch_size', 'N/A')}")
+            lines.append(f"Has More: {meta.get('has_more', False)}")
+
+    print("\n".join(lines))
 
     # Timeline Preview
-    if "timeline" in data and data["timeline"]:
-        print(f"\n--- Timeline Preview (first 5 entries) ---")
-        for i, entry in enumerate(data["timeline"][:5], 1):
-            print(f"\n{i}. Date: {entry.get('date', 'N/A')}")
-            print(f"   Type: {entry.get('type', 'N/A')}")
-            print(f"   Tweet ID: {entry.get('tweet_id', 'N/A')}")
-            print(f"   Retweet: {entry.get('is_retweet', False)}")
-            print(f"   URL: {entry.get('url', 'N/A')[:80]}...")
-
-    print("\n" + "="*60)
+    timeline = data.get("timeline")
+    if timeline:
+        lines = ["\n--- Timeline Preview (first 5 entries) ---"]
+        for i, entry in enumerate(timeline[:5], 1):
+            entry_url = entry.get('url', 'N/A')
+            lines.append(f"\n{i}. Date: {entry.get('date', 'N/A')}")
+            lines.append(f"   Type: {entry.get('type', 'N/A')}")
+            lines.append(f"   Tweet ID: {entry.get('tweet_id', 'N/A')}")
+            lines.append(f"   Retweet: {entry.get('is_retweet', False)}")
+            lines.append(f"   URL: {entry_url[:80]}...")
+        print("\n".join(lines))
+
+    print(f"\n{SEP}")
     return True
 
 
 def timeline_mode(args):
+    from metadata import get_metadata, write_json_file
+
     print_info(f"extracting from @{args.username} (timeline {args.timeline_type})...")
 
     data = get_metadata(
@@ -85,22 +149,26 @@ def timeline_mode(args):
         batch_size=args.batch_size,
         page=args.page,
         media_type=args.media_type,
-        retweets=args.retweets
+        retweets=args.retweets,
+        output_file=args.output if args.jsonl else None,
+        output_format="jsonl" if args.jsonl else "json"
     )
 
-    # Save to file if specified
-    if args.output:
+    # Save to file if specified (JSON Lines output is already streamed by the extractor)
+    if args.output and args.jsonl:
+        if "error" not in data:
+            print_success(f"Results saved to: {args.output}")
+    elif args.output:
         try:
             output_path = Path(args.output)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_json_file(output_path, data)
             print_success(f"Results saved to: {output_path}")
         except Exception as e:
             print_error(f"Failed to save output file: {e}")
 
     # Display results
     if args.json:
-        print(json.dumps(data, ensure_ascii=False, indent=2))
+        _emit_json(data, sys.stdout)
     else:
         print_result_summary(data)
 
@@ -108,6 +176,8 @@ def timeline_mode(args):
 
 
 def date_range_mode(args):
+    from metadata import get_metadata_by_date
+
     print_info(f"searching @{args.username} from {args.start_date} to {args.end_date}...")
 
     data = get_metadata_by_date(
@@ -116,12 +186,13 @@ def date_range_mode(args):
         date_start=args.start_date,
         date_end=args.end_date,
         media_filter=args.media_filter,
-        output_file=args.output
+        output_file=args.output,
+        output_format="jsonl" if args.jsonl else "json"
     )
 
     # Display results
     if args.json:
-        print(json.dumps(data, ensure_ascii=False, indent=2))
+        _emit_json(data, sys.stdout)
     else:
         if args.output:
             print_success(f"Results saved to: {args.output}")
@@ -130,7 +201,66 @@ def date_range_mode(args):
     return 0 if "error" not in data else 1
 
 
-def main():
+def _parse_fast(argv: list) -> Optional[argparse.Namespace]:
+    # Returns None for anything it does not fully understand (help, unknown or
+    # malformed options, missing required arguments) so argparse can report it
+    values = {'token': None, 'output': None, 'json': False, 'jsonl': False, 'mode': None}
+    scope = None
+    username = None
+    i = 0
+
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+
+        if scope is None and arg in MODE_DEFAULTS:
+            scope = arg
+            values['mode'] = arg
+            values.update(MODE_DEFAULTS[arg])
+            continue
+
+        flag = _FLAG_OPTIONS[scope].get(arg)
+        if flag:
+            dest, value = flag
+            values[dest] = value
+            continue
+
+        option = _VALUE_OPTIONS[scope].get(arg)
+        if option:
+            if i >= len(argv) or argv[i].startswith('-'):
+                return None
+            dest, convert = option
+            value = argv[i]
+            i += 1
+            if isinstance(convert, tuple):
+                if value not in convert:
+                    return None
+            elif convert is int:
+                try:
+                    value = int(value)
+                except ValueError:
+                    return None
+            values[dest] = value
+            continue
+
+        if scope is not None and username is None and not arg.startswith('-'):
+            username = arg
+            continue
+
+        return None
+
+    if not values['token'] or username is None:
+        return None
+    if values['jsonl'] and not values['output']:
+        return None
+    if scope == 'daterange' and not (values['start_date'] and values['end_date']):
+        return None
+
+    values['username'] = username
+    return argparse.Namespace(**values)
+
+
+def _build_full_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Twitter/X Media Metadata Extractor - Extract media URLs and metadata from Twitter/X accounts",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -151,6 +281,9 @@ Examples:
   # Save to file
   %(prog)s --token YOUR_TOKEN --output output.json timeline masteraoko
 
+  # Stream entries to a JSON Lines file
+  %(prog)s --token YOUR_TOKEN --output output.jsonl --jsonl timeline masteraoko
+
   # Get raw JSON output
   %(prog)s --token YOUR_TOKEN --json timeline masteraoko
 
@@ -171,33 +304,38 @@ Username formats supported:
     parser.add_argument('--json',
                        action='store_true',
                        help='Output raw JSON instead of formatted summary')
+    parser.add_argument('--jsonl',
+                       action='store_true',
+                       help='Stream entries to the --output file as JSON Lines (one entry per line)')
 
     # Subcommands
     subparsers = parser.add_subparsers(dest='mode', help='Extraction mode')
 
     # Timeline mode
+    timeline_defaults = MODE_DEFAULTS['timeline']
     timeline_parser = subparsers.add_parser('timeline',
                                             help='Extract from user timeline')
     timeline_parser.add_argument('username',
                                 help='Twitter username (supports multiple formats)')
     timeline_parser.add_argument('--timeline-type',
-                                default='media',
-                                choices=['media', 'timeline', 'tweets', 'with_replies'],
-                                help='Timeline type to extract (default: media)')
+                                default=timeline_defaults['timeline_type'],
+                                choices=TIMELINE_TYPES,
+                                help='Timeline type to extract (default: %(default)s)')
     timeline_parser.add_argument('--batch-size',
                                 type=int,
-                                default=100,
-                                help='Number of items per request (0 = fetch all, default: 100)')
+                                default=timeline_defaults['batch_size'],
+                                help='Number of items per request (0 = fetch all, default: %(default)s)')
     timeline_parser.add_argument('--page',
                                 type=int,
-                                default=0,
-                                help='Page number for pagination (0-based, default: 0)')
+                                default=timeline_defaults['page'],
+                                help='Page number for pagination (0-based, default: %(default)s)')
     timeline_parser.add_argument('--media-type',
-                                default='all',
-                                choices=['all', 'image', 'video', 'gif'],
-                                help='Media type filter (default: all)')
+                                default=timeline_defaults['media_type'],
+                                choices=MEDIA_TYPES,
+                                help='Media type filter (default: %(default)s)')
     timeline_parser.add_argument('--retweets',
                                 action='store_true',
+                                default=timeline_defaults['retweets'],
                                 help='Include retweets (default: exclude)')
     timeline_parser.add_argument('--no-retweets',
                                 action='store_false',
@@ -205,6 +343,7 @@ Username formats supported:
                                 help='Exclude retweets (default)')
 
     # Date range mode
+    daterange_defaults = MODE_DEFAULTS['daterange']
     daterange_parser = subparsers.add_parser('daterange',
                                             help='Extract by date range')
     daterange_parser.add_argument('username',
@@ -217,15 +356,27 @@ Username formats supported:
                                  help='End date (YYYY-MM-DD)')
     daterange_parser.add_argument('--filter',
                                  dest='media_filter',
-                                 default='filter:media',
-                                 help='Media filter (default: filter:media)')
+                                 default=daterange_defaults['media_filter'],
+                                 help='Media filter (default: %(default)s)')
 
-    args = parser.parse_args()
+    return parser
 
-    # Check if mode was specified
-    if not args.mode:
-        parser.print_help()
-        return 1
+
+def main():
+    # Fast path for well-formed invocations; argparse is only built for help and errors
+    args = _parse_fast(sys.argv[1:])
+
+    if args is None:
+        parser = _build_full_parser()
+        args = parser.parse_args()
+
+        if args.jsonl and not args.output:
+            parser.error("--jsonl requires --output")
+
+        # Check if mode was specified
+        if not args.mode:
+            parser.print_help()
+            return 1
 
     # Execute based on mode
     try:
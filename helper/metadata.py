@@ -1,13 +1,35 @@
 import re
 import json
+import functools
+from collections import OrderedDict
+from itertools import islice
 from datetime import datetime
-from typing import Optional, Dict, List, Any
-from gallery_dl.extractor import twitter
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, NamedTuple, Union, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Domain Constants
 TWITTER_IMAGE_DOMAIN = "pbs.twimg.com"
 TWITTER_VIDEO_DOMAIN = "video.twimg.com"
 
+# Media Type Filters (media_type -> (tweet type, URL kind from _classify_url))
+MEDIA_TYPE_FILTERS = {
+    'image': ('photo', 'image'),
+    'video': ('video', 'video'),
+    'gif': ('animated_gif', 'video'),
+}
+
+# Pagination positions saved per user so later pages can resume without re-fetching earlier ones
+CURSOR_CACHE_DIR = Path.home() / ".twitterxmediabatchdownloader" / "cursors"
+
+# User lookups cached per (auth_token, username) for back-to-back extractions in one process
+USER_CACHE_SIZE = 8
+_user_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
 # Error Codes
 WITHHELD_ERROR_CODE = "withheld"
 
@@ -16,6 +38,43 @@ ERROR_MSG_WITHHELD = "Account withheld. Alternative version available at: https:
 ERROR_MSG_AUTH_FAILED = "Authentication failed. Verify your auth token is valid."
 ERROR_MSG_ACCOUNT_NOT_FOUND = "Failed to fetch account information. Check the username and auth token."
 
+# Username URL Pattern
+# Case-insensitivity is scoped to the scheme/host prefix; the username is lowercased after matching
+_USERNAME_URL_RE = re.compile(r'(?i:(?:https?://)?(?:www\.)?(?:x\.com|twitter\.com))/@?([^/?#]+)')
+
+
+def _get_twitter():
+    # gallery_dl is heavy to import; defer it until an extraction actually runs
+    from gallery_dl.extractor import twitter
+    return twitter
+
+
+@functools.lru_cache(maxsize=None)
+def _extractor_pattern(extractor_class: type) -> "re.Pattern":
+    return re.compile(extractor_class.pattern)
+
+
+def _lookup_user(api: Any, auth_token: str, username: str) -> Dict[str, Any]:
+    key = (auth_token, username)
+    user = _user_cache.get(key)
+    if user is not None:
+        _user_cache.move_to_end(key)
+        return user
+
+    if username.startswith("id:"):
+        user = api.user_by_rest_id(username[3:])
+    else:
+        user = api.user_by_screen_name(username)
+
+    # Withheld accounts are never cached so the check is repeated on the next call
+    if "legacy" in user and user["legacy"].get("withheld_scope"):
+        raise ValueError(WITHHELD_ERROR_CODE)
+
+    if len(_user_cache) >= USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+    _user_cache[key] = user
+    return user
+
 
 def _parse_username(username_input: str) -> str:
     # If already in id:123456 format, return as-is
@@ -25,80 +84,198 @@ def _parse_username(username_input: str) -> str:
     username_input = username_input.strip()
 
     # Extract username from URL patterns
-    # Matches: https://x.com/USERNAME/*, https://twitter.com/USERNAME/*, etc.
-    url_patterns = [
-        r'(?:https?://)?(?:www\.)?(?:x\.com|twitter\.com)/([^/?#]+)',
-        r'(?:https?://)?(?:www\.)?(?:x\.com|twitter\.com)/@([^/?#]+)',
-    ]
-
-    for pattern in url_patterns:
-        match = re.match(pattern, username_input, re.IGNORECASE)
-        if match:
-            username = match.group(1)
-            # Remove @ if present
-            username = username.lstrip('@')
-            return username.lower()
+    # Matches: https://x.com/USERNAME/*, https://x.com/@USERNAME/*, https://twitter.com/USERNAME/*, etc.
+    match = _USERNAME_URL_RE.match(username_input)
+    if match:
+        # Remove @ if present
+        return match.group(1).lstrip('@').lower()
 
     # If no URL pattern matched, treat as plain username
     # Remove @ if present
-    username = username_input.lstrip('@')
-    return username.lower()
+    return username_input.lstrip('@').lower()
+
+
+# Last (datetime, formatted) pair; media from the same tweet share one datetime object
+_last_formatted_datetime: List[Any] = [None, None]
 
 
 def _format_datetime(dt: Any) -> str:
     if isinstance(dt, datetime):
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        # Identity rather than equality: equal instants in different timezones format differently
+        if dt is _last_formatted_datetime[0]:
+            return _last_formatted_datetime[1]
+        formatted = dt.strftime("%Y-%m-%d %H:%M:%S")
+        _last_formatted_datetime[0] = dt
+        _last_formatted_datetime[1] = formatted
+        return formatted
     return dt
 
 
-def _build_timeline_entry(media_url: str, tweet_data: Dict[str, Any]) -> Dict[str, Any]:
-    tweet_date = tweet_data.get('date', datetime.now())
+# Marks a tweet without a 'type' key, so the key is omitted rather than written as null
+_TYPE_MISSING = object()
 
-    entry = {
-        'url': media_url,
-        'date': _format_datetime(tweet_date),
-        'tweet_id': tweet_data.get('tweet_id', 0),
-    }
 
-    if 'type' in tweet_data:
-        entry['type'] = tweet_data['type']
+class TimelineEntry(NamedTuple):
+    # Compact in-memory form of a timeline entry; converted with to_dict() when building output
+    url: str
+    date: str
+    tweet_id: int
+    type: Any
+    retweet_id: Optional[int]
 
-    if 'retweet_id' in tweet_data and tweet_data['retweet_id']:
-        entry['retweet_id'] = tweet_data['retweet_id']
-        entry['is_retweet'] = True
-    else:
-        entry['is_retweet'] = False
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {
+            'url': self.url,
+            'date': self.date,
+            'tweet_id': self.tweet_id,
+        }
+
+        if self.type is not _TYPE_MISSING:
+            entry['type'] = self.type
+
+        if self.retweet_id:
+            entry['retweet_id'] = self.retweet_id
+            entry['is_retweet'] = True
+        else:
+            entry['is_retweet'] = False
 
-    return entry
+        return entry
+
+
+def _build_timeline_entry(
+    media_url: str,
+    tweet_data: Dict[str, Any],
+    fallback_date: Optional[datetime] = None
+) -> TimelineEntry:
+    # Only read the clock when the tweet has no date; callers pass one shared timestamp per run
+    tweet_date = tweet_data.get('date') or fallback_date or datetime.now()
+
+    return TimelineEntry(
+        media_url,
+        _format_datetime(tweet_date),
+        tweet_data.get('tweet_id', 0),
+        tweet_data.get('type', _TYPE_MISSING),
+        tweet_data.get('retweet_id'),
+    )
 
 
 def _is_twitter_media(media_url: str) -> bool:
     return TWITTER_IMAGE_DOMAIN in media_url or TWITTER_VIDEO_DOMAIN in media_url
 
 
-def _should_include_media(media_url: str, tweet_data: Dict[str, Any], media_type: str) -> bool:
+def _classify_url(media_url: str) -> Optional[str]:
+    # Scan the URL for the media domain once; the result feeds _should_include_media
+    if TWITTER_IMAGE_DOMAIN in media_url:
+        return 'image'
+    if TWITTER_VIDEO_DOMAIN in media_url:
+        return 'video'
+    return None
+
+
+def _should_include_media(url_kind: str, tweet_data: Dict[str, Any], media_type: str) -> bool:
     if media_type == 'all':
         return True
 
-    tweet_type = tweet_data.get('type')
-
-    if media_type == 'image':
-        return TWITTER_IMAGE_DOMAIN in media_url and tweet_type == 'photo'
-    elif media_type == 'video':
-        return TWITTER_VIDEO_DOMAIN in media_url and tweet_type == 'video'
-    elif media_type == 'gif':
-        return TWITTER_VIDEO_DOMAIN in media_url and tweet_type == 'animated_gif'
+    wanted = MEDIA_TYPE_FILTERS.get(media_type)
+    if not wanted:
+        return False
 
-    return False
+    tweet_type, kind = wanted
+    return url_kind == kind and tweet_data.get('type') == tweet_type
 
 
 def _is_withheld_error(error: Exception) -> bool:
-    error_msg = str(error).lower()
-    is_withheld_value_error = isinstance(error, ValueError) and str(error) == WITHHELD_ERROR_CODE
-    has_withheld_in_message = WITHHELD_ERROR_CODE in error_msg
-    has_withheld_in_response = hasattr(error, "response") and WITHHELD_ERROR_CODE in str(error.response.text).lower()
+    # Cheapest checks first; the response body can be a large HTML page
+    error_msg = str(error)
+    if isinstance(error, ValueError) and error_msg == WITHHELD_ERROR_CODE:
+        return True
+
+    if WITHHELD_ERROR_CODE in error_msg.lower():
+        return True
+
+    response = getattr(error, "response", None)
+    if response is None:
+        return False
+
+    response_text = getattr(response, "text", "")
+    return isinstance(response_text, str) and WITHHELD_ERROR_CODE in response_text.lower()
+
 
-    return is_withheld_value_error or has_withheld_in_message or has_withheld_in_response
+def _jsonl_line(obj: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def write_json_file(output_file: Union[str, Path], data: Dict[str, Any]):
+    if orjson:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _open_jsonl_stream(output_format: str, output_file: Optional[str]):
+    # In JSON Lines mode entries are written as they arrive instead of being collected
+    if output_format == "jsonl" and output_file:
+        return open(output_file, 'wb')
+    return None
+
+
+def _cursor_cache_path(username: str) -> Path:
+    # "id:123" is not a valid file name on Windows
+    return CURSOR_CACHE_DIR / f"{username.replace(':', '_')}.json"
+
+
+def _cursor_cache_key(timeline_type: str, batch_size: int, retweets: bool, page: int) -> str:
+    return f"{timeline_type}:{batch_size}:{int(retweets)}:{page}"
+
+
+def _load_cursors(username: str) -> Dict[str, Any]:
+    try:
+        with open(_cursor_cache_path(username), 'r', encoding='utf-8') as f:
+            cursors = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cursors if isinstance(cursors, dict) else {}
+
+
+def _load_position(username: str, key: str) -> Optional[Tuple[Optional[str], int]]:
+    position = _load_cursors(username).get(key)
+    if not isinstance(position, dict):
+        return None
+
+    cursor = position.get('cursor')
+    offset = position.get('offset')
+    if (cursor is not None and not isinstance(cursor, str)) or not isinstance(offset, int) or offset < 0:
+        return None
+    return cursor, offset
+
+
+def _save_position(username: str, key: str, cursor: Optional[str], offset: int):
+    cursors = _load_cursors(username)
+    cursors[key] = {'cursor': cursor, 'offset': offset}
+    try:
+        CURSOR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_cursor_cache_path(username), 'w', encoding='utf-8') as f:
+            json.dump(cursors, f)
+    except OSError:
+        # Only an optimization for the next page; stdout is reserved for the JSON result
+        pass
+
+
+def _track_position(extractor: Any, iterator: Any, position: List[Any]):
+    # position is [cursor, offset]: the cursor of the API page gallery_dl is reading and how
+    # many extractor messages of that page were consumed. gallery_dl only updates _cursor when
+    # it requests the next page, so a batch can stop partway through the current one.
+    for item in iterator:
+        cursor = getattr(extractor, '_cursor', None)
+        if cursor and cursor != position[0]:
+            position[0] = cursor
+            position[1] = 0
+        position[1] += 1
+        yield item
 
 
 def _build_account_info(user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -119,10 +296,13 @@ def get_metadata_by_date(
     date_start: str,
     date_end: str,
     media_filter: str = "filter:media",
-    output_file: Optional[str] = None
+    output_file: Optional[str] = None,
+    output_format: str = "json"
 ) -> Dict[str, Any]:
     # Parse username from various input formats
     username = _parse_username(username)
+    twitter = _get_twitter()
+    extraction_start = datetime.now()
 
     query = f"from:{username} since:{date_start} until:{date_end}"
     if media_filter:
@@ -131,7 +311,7 @@ def get_metadata_by_date(
     url = f"https://x.com/search?q={query}"
 
     extractor_class = twitter.TwitterSearchExtractor
-    match = re.match(extractor_class.pattern, url)
+    match = _extractor_pattern(extractor_class).match(url)
 
     if not match:
         raise ValueError(f"Invalid search URL: {url}")
@@ -145,7 +325,7 @@ def get_metadata_by_date(
         "retweets": False
     }
 
-    extractor.config = lambda key, default=None: config_dict.get(key, default)
+    extractor.config = config_dict.get
 
     try:
         extractor.initialize()
@@ -153,11 +333,7 @@ def get_metadata_by_date(
         api = twitter.TwitterAPI(extractor)
 
         try:
-            user = api.user_by_screen_name(username)
-
-            if "legacy" in user and user["legacy"].get("withheld_scope"):
-                raise ValueError(WITHHELD_ERROR_CODE)
-
+            user = _lookup_user(api, auth_token, username)
         except Exception as e:
             if _is_withheld_error(e):
                 raise ValueError(WITHHELD_ERROR_CODE)
@@ -179,40 +355,54 @@ def get_metadata_by_date(
 
         new_timeline_entries = []
 
+        stream = _open_jsonl_stream(output_format, output_file)
         try:
-            iterator = iter(extractor)
+            if stream:
+                stream.write(_jsonl_line({'account_info': structured_output['account_info']}))
 
-            while True:
-                try:
-                    item = next(iterator)
+            try:
+                iterator = iter(extractor)
+
+                while True:
+                    try:
+                        item = next(iterator)
 
-                    if isinstance(item, tuple) and len(item) >= 3:
-                        media_url = item[1]
-                        tweet_data = item[2]
+                        try:
+                            _, media_url, tweet_data = item
+                        except (TypeError, ValueError):
+                            continue
 
                         if _is_twitter_media(media_url):
-                            timeline_entry = _build_timeline_entry(media_url, tweet_data)
-                            new_timeline_entries.append(timeline_entry)
+                            timeline_entry = _build_timeline_entry(media_url, tweet_data, extraction_start)
+                            if stream:
+                                stream.write(_jsonl_line(timeline_entry.to_dict()))
+                            else:
+                                new_timeline_entries.append(timeline_entry)
                             structured_output['total_urls'] += 1
 
-                except StopIteration:
-                    break
+                    except StopIteration:
+                        break
 
-        except Exception as e:
-            print(f"Warning: Error while fetching timeline items: {e}")
+            except Exception as e:
+                print(f"Warning: Error while fetching timeline items: {e}")
 
-        structured_output['timeline'] = new_timeline_entries
+            structured_output['timeline'] = [entry.to_dict() for entry in new_timeline_entries]
 
-        structured_output['metadata'] = {
-            "new_entries": len(new_timeline_entries),
-            "method": "search_api",
-            "date_range": f"{date_start} to {date_end}"
-        }
+            structured_output['metadata'] = {
+                "new_entries": structured_output['total_urls'],
+                "method": "search_api",
+                "date_range": f"{date_start} to {date_end}"
+            }
 
-        if output_file:
+            if stream:
+                stream.write(_jsonl_line({'metadata': structured_output['metadata']}))
+        finally:
+            if stream:
+                stream.close()
+
+        if output_file and not stream:
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(structured_output, f, ensure_ascii=False, indent=2)
+                write_json_file(output_file, structured_output)
             except Exception as e:
                 print(f"Warning: Failed to write output file '{output_file}': {e}")
 
@@ -220,10 +410,12 @@ def get_metadata_by_date(
 
     except Exception as e:
         if _is_withheld_error(e):
+            _user_cache.pop((auth_token, username), None)
             return {"error": ERROR_MSG_WITHHELD}
 
         error_str = str(e)
         if error_str == "None":
+            _user_cache.pop((auth_token, username), None)
             return {"error": ERROR_MSG_AUTH_FAILED}
 
         return {"error": error_str}
@@ -236,10 +428,14 @@ def get_metadata(
     batch_size: int = 0,
     page: int = 0,
     media_type: str = "all",
-    retweets: bool = False
+    retweets: bool = False,
+    output_file: Optional[str] = None,
+    output_format: str = "json"
 ) -> Dict[str, Any]:
     # Parse username from various input formats
     username = _parse_username(username)
+    twitter = _get_twitter()
+    extraction_start = datetime.now()
 
     url = f"https://x.com/{username}/{timeline_type}"
 
@@ -252,7 +448,7 @@ def get_metadata(
     else:
         extractor_class = twitter.TwitterTimelineExtractor
 
-    match = re.match(extractor_class.pattern, url)
+    match = _extractor_pattern(extractor_class).match(url)
     if not match:
         raise ValueError(f"Invalid URL for {timeline_type}: {url}")
 
@@ -268,100 +464,123 @@ def get_metadata(
     if batch_size > 0:
         config_dict["count"] = batch_size
 
-    extractor.config = lambda key, default=None: config_dict.get(key, default)
+    # Resume from the position saved after the previous page instead of re-fetching every earlier item
+    resume_position = None
+    if batch_size > 0 and page > 0:
+        resume_position = _load_position(username, _cursor_cache_key(timeline_type, batch_size, retweets, page - 1))
+        if resume_position and resume_position[0]:
+            config_dict["cursor"] = resume_position[0]
+
+    extractor.config = config_dict.get
 
     try:
         extractor.initialize()
 
         api = twitter.TwitterAPI(extractor)
         try:
-            if username.startswith("id:"):
-                user = api.user_by_rest_id(username[3:])
-            else:
-                user = api.user_by_screen_name(username)
-
-            if "legacy" in user and user["legacy"].get("withheld_scope"):
-                raise ValueError(WITHHELD_ERROR_CODE)
-
+            user = _lookup_user(api, auth_token, username)
         except Exception as e:
             if _is_withheld_error(e):
                 raise ValueError(WITHHELD_ERROR_CODE)
             raise
 
-        structured_output = {
-            'account_info': {},
-            'total_urls': 0,
-            'timeline': []
-        }
-
-        iterator = iter(extractor)
+        # Only batched requests save a position, so "fetch all" skips the tracking wrapper
+        if batch_size > 0:
+            position = [resume_position[0] if resume_position else None, 0]
+            iterator = _track_position(extractor, iter(extractor), position)
+        else:
+            iterator = iter(extractor)
 
         if batch_size > 0 and page > 0:
-            items_to_skip = page * batch_size
+            # Skip what the previous pages already returned from the resumed API page,
+            # or every earlier item when no position was saved
+            items_to_skip = resume_position[1] if resume_position else page * batch_size
 
-            if hasattr(extractor, '_cursor') and extractor._cursor:
+            try:
+                for _ in range(items_to_skip):
+                    next(iterator)
+            except StopIteration:
                 pass
-            else:
-                skipped = 0
-                try:
-                    for _ in range(items_to_skip):
-                        next(iterator)
-                        skipped += 1
-                except StopIteration:
-                    pass
+
+        stream = _open_jsonl_stream(output_format, output_file)
 
         new_timeline_entries = []
 
-        items_to_fetch = batch_size if batch_size > 0 else float('inf')
         items_fetched = 0
+        total_urls = 0
+        account_info = {}
+        account_seen = False
 
-        try:
-            while items_fetched < items_to_fetch:
-                item = next(iterator)
-                items_fetched += 1
-
-                if isinstance(item, tuple) and len(item) >= 3:
-                    media_url = item[1]
-                    tweet_data = item[2]
-
-                    if not structured_output['account_info'] and 'user' in tweet_data:
-                        user = tweet_data['user']
-                        structured_output['account_info'] = _build_account_info(user)
-
-                    if _is_twitter_media(media_url):
-                        timeline_entry = _build_timeline_entry(media_url, tweet_data)
-
-                        if _should_include_media(media_url, tweet_data, media_type):
-                            new_timeline_entries.append(timeline_entry)
-                            structured_output['total_urls'] += 1
-        except StopIteration:
-            pass
-
-        structured_output['timeline'].extend(new_timeline_entries)
+        # Hot loop: bind helpers to locals and let islice handle the batch limit and exhaustion
+        classify_url = _classify_url
+        build_entry = _build_timeline_entry
+        include_media = _should_include_media
+        append_entry = new_timeline_entries.append
 
-        cursor_info = None
-        if hasattr(extractor, '_cursor') and extractor._cursor:
-            cursor_info = extractor._cursor
+        try:
+            for items_fetched, item in enumerate(islice(iterator, batch_size if batch_size > 0 else None), 1):
+                try:
+                    _, media_url, tweet_data = item
+                except (TypeError, ValueError):
+                    continue
+
+                if not account_seen and (user := tweet_data.get('user')):
+                    account_info = _build_account_info(user)
+                    account_seen = True
+                    if stream:
+                        stream.write(_jsonl_line({'account_info': account_info}))
+
+                # Filter before building so rejected media never pay for the entry dict
+                url_kind = classify_url(media_url)
+                if url_kind and include_media(url_kind, tweet_data, media_type):
+                    timeline_entry = build_entry(media_url, tweet_data, extraction_start)
+                    if stream:
+                        stream.write(_jsonl_line(timeline_entry.to_dict()))
+                    else:
+                        append_entry(timeline_entry)
+                    total_urls += 1
+
+            cursor_info = None
+            if hasattr(extractor, '_cursor') and extractor._cursor:
+                cursor_info = extractor._cursor
+
+            # Always overwrite, so an older session's position for this page is never reused
+            if batch_size > 0:
+                _save_position(username, _cursor_cache_key(timeline_type, batch_size, retweets, page), *position)
+
+            # Assemble the result once the loop has only touched locals
+            structured_output = {
+                'account_info': account_info,
+                'total_urls': total_urls,
+                'timeline': [entry.to_dict() for entry in new_timeline_entries],
+                'metadata': {
+                    "new_entries": total_urls,
+                    "page": page,
+                    "batch_size": batch_size,
+                    "has_more": batch_size > 0 and items_fetched == batch_size,
+                    "cursor": cursor_info
+                }
+            }
 
-        structured_output['metadata'] = {
-            "new_entries": len(new_timeline_entries),
-            "page": page,
-            "batch_size": batch_size,
-            "has_more": batch_size > 0 and items_fetched == batch_size,
-            "cursor": cursor_info
-        }
+            if stream:
+                stream.write(_jsonl_line({'metadata': structured_output['metadata']}))
+        finally:
+            if stream:
+                stream.close()
 
-        if not structured_output['account_info']:
+        if not account_info:
             raise ValueError(ERROR_MSG_ACCOUNT_NOT_FOUND)
 
         return structured_output
 
     except Exception as e:
         if _is_withheld_error(e):
+            _user_cache.pop((auth_token, username), None)
             return {"error": ERROR_MSG_WITHHELD}
 
         error_str = str(e)
         if error_str == "None":
+            _user_cache.pop((auth_token, username), None)
             return {"error": ERROR_MSG_AUTH_FAILED}
 
         return {"error": error_str}